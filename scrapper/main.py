@@ -1,189 +1,355 @@
+import argparse
 import asyncio
+import csv
 import logging
+import os
+import re
+import time
 from pathlib import Path
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
-import pandas as pd
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlparse
+import aiofiles
+import aiohttp
+from selectolax.lexbor import LexborHTMLParser
+from tqdm.asyncio import tqdm_asyncio
+from tqdm.contrib.logging import logging_redirect_tqdm
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# CSS selectors shared by every listing page and table row
+_TABLE_SEL = "table"
+_ROW_SEL = "tr"
+_LINK_SEL = "span.tablesaw-cell-content a, a"
+_LAST_PAGE_SEL = "li.pager__item--last a"
+
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media', 'stylesheet'})
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Ask for PDFs uncompressed so a HEAD's Content-Length matches the size on disk
+_PDF_HEADERS = {'Accept-Encoding': 'identity'}
+
+class FormInfo(NamedTuple):
+    """One row of the IRS forms table; field order is the metadata CSV column order"""
+    product_number: str
+    title: str
+    revision_date: str
+    posted_date: str
+    pdf_url: str
+    filename: str
+    scraped_date: str
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts up to `capacity`"""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
 class IRSFormsScraper:
-    def __init__(self, download_dir="irs_pdfs", filter_important_only=True):
+    # Form-number prefixes of core individual and business forms, by length
+    _PREFIXES_4 = frozenset({'1040', '1099', '1120', '1065', '1041'})
+    _PREFIXES_3 = frozenset({'w-2', 'w-4', '941', '940'})
+    # Key publications (\b keeps e.g. "publication 17" from matching 170-179)
+    _PUBS_RE = re.compile(r'publication (17|334|535|946|970|523|936)\b', re.I)
+    # Schedules and instructions
+    _TITLE_RE = re.compile(r'schedule|instructions for form', re.I)
+    # Non-English versions, usually marked "(... Version)" in the title
+    _LANG_RE = re.compile(r'version\)|spanish|chinese|vietnamese|korean|russian|haitian', re.I)
+    
+    def __init__(self, download_dir="irs_pdfs", filter_important_only=True, use_js=False):
         self.base_url = "https://www.irs.gov"
         self.forms_url = "https://www.irs.gov/forms-instructions-and-publications"
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(exist_ok=True)
         self.metadata_file = self.download_dir / "metadata.csv"
+        # Stream PDFs in ~64KB chunks, rounded to the filesystem's block size
+        block_size = os.stat(self.download_dir).st_blksize
+        self._chunk_size = block_size * max(1, (64 * 1024) // block_size)
+        # ...but hand them to the file in 1MB batches to cut write calls
+        self._write_batch_size = self._chunk_size * max(1, (1024 * 1024) // self._chunk_size)
         self.filter_important_only = filter_important_only
+        # Listing pages are server-rendered; Chromium is only a fallback
+        self.use_js = use_js
         self.total_forms_found = 0
         self.important_forms_found = 0
         self.downloaded_count = 0
+        # Every row scraped in a run shares one timestamp
+        self._run_timestamp = datetime.now().isoformat()
+        # Keep PDF downloads polite towards irs.gov
+        self.max_concurrent_downloads = 8
+        self.max_concurrent_pages = 4
+        self.requests_per_second = 2
         
     def is_important_form(self, form_info):
         """Filter important forms for tax GPT training"""
-        product_number = form_info['product_number'].lower()
-        title = form_info['title'].lower()
+        product_number = form_info.product_number
+        title = form_info.title
         
         # Filter out non-English versions
-        # usually have "Version" or "version" in parentheses
-        if 'version)' in title or \
-            'Version' in title or \
-            'Spanish' in title or \
-            'Chinese' in title or \
-            'Vietnamese' in title:
+        if self._LANG_RE.search(title):
             return False
         
-        # Core individual tax forms
-        if any(product_number.startswith(prefix) \
-           for prefix in ['1040', 'w-2', 'w-4', '1099']):
-            return True
-        
-        # Business forms
-        if any(product_number.startswith(prefix) \
-           for prefix in ['1120', '1065', '1041', '941', '940']):
+        # Core individual and business tax forms
+        if product_number[:4].lower() in self._PREFIXES_4 or \
+           product_number[:3].lower() in self._PREFIXES_3:
             return True
         
-        # Schedules
-        if 'schedule' in product_number or \
-           'schedule' in title:
-            return True
-        
-        # Key publications
-        important_pubs = ['publication 17', 'publication 334', 'publication 535', 
-                         'publication 946', 'publication 970', 'publication 523', 'publication 936']
-        if any(pub in title for pub in important_pubs):
-            return True
-        
-        # Instructions
-        if 'instructions for form' in title or \
-           'instructions for schedule' in title:
+        # Schedules, instructions and key publications
+        if 'schedule' in product_number.lower() or \
+           self._TITLE_RE.search(title) or \
+           self._PUBS_RE.search(title):
             return True
         
         return False
         
     async def scrape_all_pages(self, max_pages=None):
         """Scrape all pages of IRS forms and publications"""
-        async with async_playwright() as p:
-            # Launch browser with download settings
-            browser = await p.chromium.launch(
-                headless=True,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-            
-            context = await browser.new_context(
-                accept_downloads=True,
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-            
-            page = await context.new_page()
-            
+        # Refresh the timestamp so each run is stamped with its own start time
+        self._run_timestamp = datetime.now().isoformat()
+        
+        # Created here so they bind to the running event loop
+        self._download_sem = asyncio.Semaphore(self.max_concurrent_downloads)
+        self._page_sem = asyncio.Semaphore(self.max_concurrent_pages)
+        self._rate_limiter = RateLimiter(self.requests_per_second, capacity=self.max_concurrent_downloads)
+        # One directory scan instead of an exists() check per form
+        self._downloaded = {p.name for p in self.download_dir.iterdir() if p.suffix == '.pdf'}
+        # Filenames currently being downloaded; several products can share one PDF
+        self._in_flight = set()
+        # Filenames (re)written this run, whose metadata rows must be refreshed
+        self._saved_files = set()
+        # One reusable write buffer per download slot
+        self._write_buffers = [
+            bytearray(self._write_batch_size) for _ in range(self.max_concurrent_downloads)
+        ]
+        
+        async with aiohttp.ClientSession(headers={'User-Agent': _USER_AGENT}) as session:
+            playwright = browser = context = None
             all_forms_data = []
-            current_page = 1
             
+            # Metadata rows are appended as pages finish so a crash keeps earlier progress
+            # Keyed by form, not URL: several products can link the same PDF.
+            # Values are the recorded revision dates, to spot updated forms.
+            self._recorded_forms = {
+                (row['product_number'], row['pdf_url']): row['revision_date']
+                for row in self.load_existing_metadata()
+            }
+            # Forms whose older rows must be dropped once the run is over
+            self._superseded_forms = set()
+            self._metadata_rows_written = 0
+            write_header = not self.metadata_file.exists() or self.metadata_file.stat().st_size == 0
+            self._metadata_fh = open(self.metadata_file, 'a', newline='', encoding='utf-8')
             try:
-                while True:
-                    if max_pages and current_page > max_pages:
-                        logger.info(f"Reached maximum pages limit ({max_pages})")
-                        break
-                        
-                    logger.info(f"Scraping page {current_page}...")
-                    
-                    # Navigate to the forms page (or next page)
-                    if current_page == 1:
-                        await page.goto(self.forms_url, wait_until='networkidle')
-                    else:
-                        # Click next page link
-                        try:
-                            next_link = await page.wait_for_selector('a[title="Go to next page"]', timeout=10000)
-                            if next_link:
-                                await next_link.click()
-                                await page.wait_for_load_state('networkidle')
-                                logger.info(f"Navigated to page {current_page}")
-                            else:
-                                logger.info("No next page found - reached end")
-                                break
-                        except Exception as e:
-                            logger.info(f"No next page found: {e}")
-                            break
-                    
-                    # Wait for the table to load
-                    try:
-                        await page.wait_for_selector('table', timeout=30000)
-                    except Exception as e:
-                        logger.error(f"Table not found on page {current_page}: {e}")
-                        break
-                    
-                    # Get the page content
-                    content = await page.content()
-                    soup = BeautifulSoup(content, 'html.parser')
-                    
-                    # Find the main table with forms
-                    table = soup.find('table')
-                    if not table:
-                        logger.warning(f"No table found on page {current_page}")
-                        break
-                    
-                    page_forms_data = []
-                    rows = table.find_all('tr')[1:]  # Skip header row
-                    
-                    logger.info(f"Found {len(rows)} forms on page {current_page}")
-                    
-                    for idx, row in enumerate(rows):
-                        try:
-                            form_info = self.extract_form_info(row)
-                            if form_info:
-                                self.total_forms_found += 1
-                                
-                                # Check if form is important
-                                if self.filter_important_only and not self.is_important_form(form_info):
-                                    logger.debug(f"Skipping non-important form: {form_info['product_number']}")
-                                    continue
-                                
-                                self.important_forms_found += 1
-                                page_forms_data.append(form_info)
-                                
-                                # Download PDF with delay (respecting rate limits)
-                                if form_info['pdf_url'] and form_info['pdf_url'].endswith('.pdf'):
-                                    await self.download_pdf(page, form_info, idx)
-                                    # Wait 1-3 seconds between downloads
-                                    await asyncio.sleep(1 + (idx % 3))
-                                    
-                        except Exception as e:
-                            logger.error(f"Error processing row {idx} on page {current_page}: {str(e)}")
-                            continue
+                self._csv_writer = csv.writer(self._metadata_fh)
+                if write_header:
+                    self._csv_writer.writerow(FormInfo._fields)
+                
+                # Set up inside the try so a failed launch still stops the driver
+                if self.use_js:
+                    # Imported lazily so the plain HTTP path never needs Playwright
+                    from playwright.async_api import async_playwright
                     
+                    playwright = await async_playwright().start()
+                    browser = await playwright.chromium.launch(
+                        headless=True,
+                        args=['--disable-blink-features=AutomationControlled']
+                    )
+                    context = await browser.new_context(user_agent=_USER_AGENT)
+                    # Only the HTML table is read, so skip every other sub-resource
+                    await context.route('**/*', self._filter_browser_request)
+                
+                # Read the page count from page 1's pager so every page can be
+                # fetched at once instead of following "next" links
+                first_tree = await self._load_listing_page(context, session, 1)
+                total_pages = 0
+                if first_tree is not None:
+                    total_pages = self._count_pages(first_tree)
+                    if total_pages is None:
+                        logger.warning("Pager not found - assuming a single page")
+                        total_pages = 1
+                    if max_pages and total_pages > max_pages:
+                        logger.info(f"Reached maximum pages limit ({max_pages})")
+                        total_pages = max_pages
+                    logger.info(f"Scraping {total_pages} pages...")
+                
+                results = await tqdm_asyncio.gather(
+                    *(
+                        self._scrape_one_page(context, session, n, tree=first_tree if n == 1 else None)
+                        for n in range(1, total_pages + 1)
+                    ),
+                    desc="Pages", unit="page"
+                )
+                for page_forms_data in results:
                     all_forms_data.extend(page_forms_data)
-                    logger.info(f"Page {current_page} complete. Total forms so far: {len(all_forms_data)}")
                     
-                    current_page += 1
+            except Exception:
+                logger.exception("Error during scraping")
+            finally:
+                self._metadata_fh.close()
+                if browser:
+                    await browser.close()
+                if playwright:
+                    await playwright.stop()
+            
+            if self._superseded_forms:
+                self._drop_superseded_rows()
+            
+            logger.info(f"Saved metadata for {self._metadata_rows_written} forms to {self.metadata_file}")
+            
+            return all_forms_data
+    
+    async def _load_listing_page(self, context, session, page_number):
+        """Fetch and parse a listing page, or return None if it could not be loaded"""
+        async with self._page_sem:
+            logger.info(f"Scraping page {page_number}...")
+            try:
+                await self._rate_limiter.acquire()
+                if self.use_js:
+                    content = await self._render_listing_page(context, page_number)
+                else:
+                    content = await self._fetch_listing_page(session, page_number)
+            except Exception as e:
+                logger.error(f"Error loading page {page_number}: {e}")
+                return None
+        
+        if content is None:
+            return None
+        return LexborHTMLParser(content)
+    
+    def _count_pages(self, tree):
+        """Total number of listing pages from the pager's "last page" link, if any"""
+        last_link = tree.css_first(_LAST_PAGE_SEL)
+        if not last_link:
+            return None
+        query = parse_qs(urlparse(last_link.attributes.get('href') or '').query)
+        try:
+            return int(query['page'][0]) + 1  # ?page= is zero-based
+        except (KeyError, ValueError):
+            return None
+    
+    async def _scrape_one_page(self, context, session, page_number, tree=None):
+        """Scrape one listing page and download its PDFs
+        
+        `tree` is the already-parsed page, if the caller has it. Returns the
+        important forms on the page (empty if the page could not be read).
+        """
+        if tree is None:
+            tree = await self._load_listing_page(context, session, page_number)
+            if tree is None:
+                return []
+        
+        # Find the main table with forms
+        table = tree.css_first(_TABLE_SEL)
+        if not table:
+            logger.warning(f"No table found on page {page_number}")
+            return []
+        
+        page_forms_data = []
+        rows = table.css(_ROW_SEL)[1:]  # Skip header row
+        
+        logger.info(f"Found {len(rows)} forms on page {page_number}")
+        
+        for idx, row in enumerate(rows):
+            try:
+                form_info = self.extract_form_info(row)
+                if form_info:
+                    self.total_forms_found += 1
                     
-                    # Add delay between pages
-                    await asyncio.sleep(2)
+                    # Check if form is important
+                    if self.filter_important_only and not self.is_important_form(form_info):
+                        logger.debug(f"Skipping non-important form: {form_info.product_number}")
+                        continue
                     
+                    self.important_forms_found += 1
+                    page_forms_data.append(form_info)
+                        
             except Exception as e:
-                logger.error(f"Error during scraping: {e}")
-            finally:
-                await browser.close()
+                logger.error(f"Error processing row {idx} on page {page_number}: {str(e)}")
+                continue
+        
+        # One entry per filename, since several products can link the same PDF
+        pdf_forms = list({
+            form_info.filename: form_info
+            for form_info in page_forms_data
+            if form_info.pdf_url.endswith('.pdf')
+        }.values())
+        
+        # HEAD the PDFs already on disk in one batch to find any that changed
+        await asyncio.gather(*(
+            self._check_up_to_date(session, form_info)
+            for form_info in pdf_forms
+            if form_info.filename in self._downloaded
+        ))
+        
+        # Download the page's PDFs concurrently (bounded and rate limited)
+        await asyncio.gather(*(
+            self._bounded_download(session, form_info, i)
+            for i, form_info in enumerate(pdf_forms)
+        ))
+        self.save_metadata(page_forms_data)
+        
+        logger.info(f"Page {page_number} complete. Forms on page: {len(page_forms_data)}")
+        return page_forms_data
+    
+    def _listing_page_url(self, page_number):
+        """URL of a listing page (the ?page= query is zero-based)"""
+        return f"{self.forms_url}?page={page_number - 1}"
+    
+    async def _fetch_listing_page(self, session, page_number):
+        """Fetch the HTML of a listing page with a plain GET"""
+        async with session.get(self._listing_page_url(page_number)) as response:
+            if response.status != 200:
+                logger.error(f"Failed to load page {page_number}: Status {response.status}")
+                return None
+            return await response.text()
+    
+    async def _render_listing_page(self, context, page_number):
+        """Fetch the HTML of a listing page through headless Chromium (--js)"""
+        page = await context.new_page()
+        try:
+            # The table is in the initial HTML; no need to wait for the network to settle
+            await page.goto(self._listing_page_url(page_number), wait_until='domcontentloaded')
             
-            # Save metadata
-            self.save_metadata(all_forms_data)
+            # Wait for the table to load
+            try:
+                await page.wait_for_selector('table', timeout=30000)
+            except Exception as e:
+                logger.error(f"Table not found on page {page_number}: {e}")
+                return None
             
-            return all_forms_data
+            return await page.content()
+        finally:
+            await page.close()
+    
+    async def _filter_browser_request(self, route):
+        """Abort requests for assets and analytics the scraper never reads (--js)"""
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or 'analytics' in request.url:
+            await route.abort()
+        else:
+            await route.continue_()
     
     def extract_form_info(self, row):
         """Extract form information from a table row"""
         try:
-            cells = row.find_all('td')
+            # Cells are direct children of the row, so walk them instead of
+            # running a descendant selector query per row
+            cells = [node for node in row.iter() if node.tag == 'td']
             if len(cells) < 4:
                 return None
             
@@ -193,44 +359,64 @@ class IRSFormsScraper:
             revision_date_cell = cells[2]
             posted_date_cell = cells[3]
             
-            # Find the link in the product cell
-            # Look for span with class 'tablesaw-cell-content' first
-            span_elem = product_cell.find('span', class_='tablesaw-cell-content')
-            if span_elem:
-                link_elem = span_elem.find('a')
-            else:
-                # Fallback to direct link search
-                link_elem = product_cell.find('a')
+            # Find the link in the product cell: the first <a> anywhere in the
+            # cell, in document order (whether or not it sits in a tablesaw span)
+            link_elem = product_cell.css_first(_LINK_SEL)
             
             if not link_elem:
                 return None
             
-            product_number = link_elem.text.strip()
-            pdf_url = link_elem.get('href', '')
+            product_number = link_elem.text().strip()
+            pdf_url = link_elem.attributes.get('href') or ''
             
             # Make absolute URL if relative
             if pdf_url and not pdf_url.startswith('http'):
                 pdf_url = self.base_url + pdf_url
             
-            return {
-                'product_number': product_number,
-                'title': title_cell.text.strip(),
-                'revision_date': revision_date_cell.text.strip(),
-                'posted_date': posted_date_cell.text.strip(),
-                'pdf_url': pdf_url,
-                'filename': pdf_url.split('/')[-1] if pdf_url else '',
-                'scraped_date': datetime.now().isoformat()
-            }
+            return FormInfo(
+                product_number=product_number,
+                title=title_cell.text().strip(),
+                revision_date=revision_date_cell.text().strip(),
+                posted_date=posted_date_cell.text().strip(),
+                pdf_url=pdf_url,
+                filename=pdf_url.split('/')[-1] if pdf_url else '',
+                scraped_date=self._run_timestamp
+            )
             
         except Exception as e:
             logger.error(f"Error extracting form info: {e}")
             return None
     
-    async def download_pdf(self, page, form_info, index):
+    async def _check_up_to_date(self, session, form_info):
+        """Forget a saved PDF whose size no longer matches the server's copy
+        
+        Missing Content-Length headers or failed HEAD requests keep the saved copy.
+        """
+        filename = form_info.filename
+        try:
+            async with self._download_sem:
+                await self._rate_limiter.acquire()
+                async with session.head(form_info.pdf_url, headers=_PDF_HEADERS, allow_redirects=True) as response:
+                    if response.status != 200:
+                        return
+                    remote_size = int(response.headers.get('Content-Length', -1))
+            
+            if remote_size >= 0 and remote_size != (self.download_dir / filename).stat().st_size:
+                logger.info(f"Remote copy changed, re-downloading: {filename}")
+                self._downloaded.discard(filename)
+        except Exception as e:
+            logger.warning(f"Could not check {filename} for updates: {e}")
+    
+    async def _bounded_download(self, session, form_info, index):
+        """Download a PDF once one of the concurrent download slots is free"""
+        async with self._download_sem:
+            await self.download_pdf(session, form_info, index)
+    
+    async def download_pdf(self, session, form_info, index):
         """Download a single PDF file"""
         try:
-            pdf_url = form_info['pdf_url']
-            filename = form_info['filename']
+            pdf_url = form_info.pdf_url
+            filename = form_info.filename
             
             if not filename:
                 return
@@ -238,37 +424,108 @@ class IRSFormsScraper:
             filepath = self.download_dir / filename
             
             # Skip if already downloaded
-            if filepath.exists():
+            if filename in self._downloaded:
                 logger.info(f"[{index}] Already downloaded: {filename}")
                 return
+            if filename in self._in_flight:
+                logger.info(f"[{index}] Already downloading: {filename}")
+                return
             
-            logger.info(f"[{index}] Downloading: {filename}")
-            
-            # Navigate to PDF URL and download
-            response = await page.request.get(pdf_url)
-            if response.status == 200:
-                content = await response.body()
-                filepath.write_bytes(content)
-                self.downloaded_count += 1
-                logger.info(f"[{index}] Saved: {filename}")
-            else:
-                logger.error(f"[{index}] Failed to download {filename}: Status {response.status}")
+            # Reserve the filename before the first await so a concurrent row
+            # linking the same PDF skips it instead of racing on the .part file
+            self._in_flight.add(filename)
+            try:
+                logger.info(f"[{index}] Downloading: {filename}")
+                
+                await self._rate_limiter.acquire()
+                async with session.get(pdf_url, headers=_PDF_HEADERS) as response:
+                    if response.status == 200:
+                        # Write to a temporary file first so an interrupted download
+                        # is never mistaken for a complete PDF on the next run
+                        part_path = filepath.with_name(filename + '.part')
+                        await self._write_response(response, part_path)
+                        os.replace(part_path, filepath)
+                        self._downloaded.add(filename)
+                        self._saved_files.add(filename)
+                        self.downloaded_count += 1
+                        logger.info(f"[{index}] Saved: {filename}")
+                    else:
+                        logger.error(f"[{index}] Failed to download {filename}: Status {response.status}")
+            finally:
+                self._in_flight.discard(filename)
                 
         except Exception as e:
-            logger.error(f"[{index}] Error downloading {form_info['product_number']}: {str(e)}")
+            logger.error(f"[{index}] Error downloading {form_info.product_number}: {str(e)}")
+    
+    async def _write_response(self, response, path):
+        """Stream a response body to `path` through a pooled write buffer"""
+        # The download semaphore guarantees a free buffer; allocate one only
+        # when download_pdf is called outside of _bounded_download
+        if self._write_buffers:
+            buffer = self._write_buffers.pop()
+        else:
+            buffer = bytearray(self._write_batch_size)
+        
+        view = memoryview(buffer)
+        try:
+            async with aiofiles.open(path, 'wb') as f:
+                filled = 0
+                async for chunk in response.content.iter_chunked(self._chunk_size):
+                    if filled + len(chunk) > len(view):
+                        await f.write(view[:filled])
+                        filled = 0
+                    view[filled:filled + len(chunk)] = chunk
+                    filled += len(chunk)
+                if filled:
+                    await f.write(view[:filled])
+        finally:
+            view.release()
+            self._write_buffers.append(buffer)
     
     def save_metadata(self, forms_data):
-        """Save form metadata to CSV"""
-        if forms_data:
-            df = pd.DataFrame(forms_data)
-            df.to_csv(self.metadata_file, index=False)
-            logger.info(f"Saved metadata for {len(forms_data)} forms to {self.metadata_file}")
+        """Append metadata for forms that are new, revised or re-downloaded
+        
+        Rows for forms already in the CSV are marked superseded and the older
+        rows are dropped by _drop_superseded_rows() at the end of the run.
+        """
+        for form_info in forms_data:
+            key = (form_info.product_number, form_info.pdf_url)
+            if key in self._recorded_forms:
+                if self._recorded_forms[key] == form_info.revision_date and \
+                   form_info.filename not in self._saved_files:
+                    continue
+                self._superseded_forms.add(key)
+            self._csv_writer.writerow(form_info)
+            self._recorded_forms[key] = form_info.revision_date
+            self._metadata_rows_written += 1
+        self._metadata_fh.flush()
+    
+    def _drop_superseded_rows(self):
+        """Rewrite the CSV keeping only the newest row of each superseded form"""
+        rows = self.load_existing_metadata()
+        newest = {}
+        for i, row in enumerate(rows):
+            key = (row['product_number'], row['pdf_url'])
+            if key in self._superseded_forms:
+                newest[key] = i
+        
+        # Write a temporary file first so a crash never leaves a truncated CSV
+        tmp_path = self.metadata_file.with_name(self.metadata_file.name + '.tmp')
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FormInfo._fields)
+            writer.writeheader()
+            for i, row in enumerate(rows):
+                key = (row['product_number'], row['pdf_url'])
+                if newest.get(key, i) == i:
+                    writer.writerow(row)
+        os.replace(tmp_path, self.metadata_file)
     
     def load_existing_metadata(self):
-        """Load existing metadata if available"""
+        """Load existing metadata rows (as dicts) if available"""
         if self.metadata_file.exists():
-            return pd.read_csv(self.metadata_file)
-        return pd.DataFrame()
+            with open(self.metadata_file, newline='', encoding='utf-8') as f:
+                return list(csv.DictReader(f))
+        return []
     
     def print_summary(self):
         """Print scraping summary"""
@@ -283,16 +540,37 @@ class IRSFormsScraper:
 
 async def main():
     """Main function to run the scraper"""
+    parser = argparse.ArgumentParser(description="Download IRS forms and publications")
+    parser.add_argument(
+        '--js', action='store_true',
+        help="render listing pages with headless Chromium (Playwright) instead of plain HTTP"
+    )
+    args = parser.parse_args()
+    
+    # Configure logging here rather than at import time, so importing the
+    # scraper does not open scraper.log or touch the root logger
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('scraper.log'),
+            logging.StreamHandler()
+        ]
+    )
+    
     logger.info("Starting IRS Forms scraper...")
     
     # Initialize scraper with filtering enabled
     scraper = IRSFormsScraper(
         download_dir="irs_pdfs", 
-        filter_important_only=True  # Set to False to download all forms
+        filter_important_only=True,  # Set to False to download all forms
+        use_js=args.js
     )
     
     # Scrape all pages (set max_pages=None for all pages, or a number to limit)
-    forms = await scraper.scrape_all_pages(max_pages=5)  # Limit to 5 pages for testing
+    # Log lines are routed through tqdm so they don't break the progress bar
+    with logging_redirect_tqdm():
+        forms = await scraper.scrape_all_pages(max_pages=5)  # Limit to 5 pages for testing
     
     # Print summary
     scraper.print_summary()
@@ -301,11 +579,11 @@ async def main():
     if forms:
         logger.info("\nSample of important forms scraped:")
         for form in forms[:10]:
-            logger.info(f"- {form['product_number']}: {form['title']}")
+            logger.info(f"- {form.product_number}: {form.title}")
 
 if __name__ == "__main__":
     # Install required packages:
-    # pip install playwright beautifulsoup4 pandas
-    # playwright install chromium
+    # pip install selectolax aiohttp aiofiles tqdm
+    # Only for --js: pip install playwright && playwright install chromium
     
     asyncio.run(main())
\ No newline at end of file